@@ -13,8 +13,12 @@ LUNCH_THRESHOLD_HOURS = float(os.getenv("TICKTICK_LUNCH_THRESHOLD", "6"))
 LUNCH_DURATION_MINUTES = int(os.getenv("TICKTICK_LUNCH_DURATION", "30"))
 HOST = os.getenv("TICKTICK_HOST", "0.0.0.0")
 PORT = int(os.getenv("TICKTICK_PORT", "8000"))
+DB_POOL_SIZE = int(os.getenv("TICKTICK_DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("TICKTICK_DB_MAX_OVERFLOW", "40"))
+TEMPLATE_RELOAD = os.getenv("TICKTICK_TEMPLATE_RELOAD", "false").lower() in ("1", "true", "yes")
 
 # Calculated values
 WORK_DAYS_PER_WEEK = 5
 DAILY_REQUIREMENT_MINUTES = (WEEKLY_HOURS * 60) / WORK_DAYS_PER_WEEK
+DAILY_TARGET_SECONDS = int(DAILY_REQUIREMENT_MINUTES * 60)
 MAX_DAILY_SECONDS = int(MAX_DAILY_HOURS * 3600)
@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy import ForeignKey, Date, DateTime, Integer, String, Boolean
+from sqlalchemy import ForeignKey, Date, DateTime, Integer, String, Boolean, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -7,6 +7,10 @@ from app.database import Base
 
 class WorkSession(Base):
     __tablename__ = "work_sessions"
+    __table_args__ = (
+        # Serves the statistics range filters and the recent sessions ordering
+        Index("ix_work_sessions_status_date_start", "status", "date", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -15,7 +19,12 @@ class WorkSession(Base):
     net_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="active")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Rendered inline as SQL so SQLite fills it in; local time like created_at
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=func.datetime("now", "localtime"),
+        onupdate=func.datetime("now", "localtime"),
+    )
 
     pause_periods: Mapped[list["PausePeriod"]] = relationship(
         "PausePeriod", back_populates="session", cascade="all, delete-orphan"
@@ -26,7 +35,9 @@ class PausePeriod(Base):
     __tablename__ = "pause_periods"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    session_id: Mapped[int] = mapped_column(Integer, ForeignKey("work_sessions.id"), nullable=False)
+    session_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("work_sessions.id"), nullable=False, index=True
+    )
     pause_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     pause_end: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
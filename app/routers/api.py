@@ -1,18 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+import zlib
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas import StatusResponse, ActionResponse, StatisticsResponse, SessionDetailResponse, SessionUpdateRequest
+from app.schemas import (
+    StatusResponse,
+    ActionResponse,
+    StatisticsResponse,
+    DashboardResponse,
+    SessionDetailResponse,
+    SessionUpdateRequest,
+)
 from app.services import timer
 from app.services import statistics
 
 router = APIRouter(prefix="/api", tags=["api"])
 
 
+def json_response(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes with Pydantic"""
+    # Skips FastAPI's jsonable_encoder + json.dumps round trip for the
+    # read endpoints; response_model is kept for the OpenAPI schema.
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
 @router.get("/status", response_model=StatusResponse)
-def get_status(db: Session = Depends(get_db)):
+def get_status(request: Request, db: Session = Depends(get_db)):
     """Get current timer status and calculations"""
-    return timer.get_status(db)
+    status = timer.get_status(db)
+    if status.status != "idle":
+        return json_response(status)
+
+    # Running and paused bodies change every second, so only an idle status
+    # can ever revalidate; the ETag is built from the body bytes themselves
+    body = status.model_dump_json()
+    etag = f'W/"{zlib.crc32(body.encode()):08x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("/start", response_model=ActionResponse)
@@ -48,7 +76,18 @@ def reset_timer(db: Session = Depends(get_db)):
 @router.get("/statistics/summary", response_model=StatisticsResponse)
 def get_statistics(db: Session = Depends(get_db)):
     """Get weekly/monthly statistics"""
-    return statistics.get_statistics(db)
+    return json_response(statistics.get_statistics(db))
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+def get_dashboard(db: Session = Depends(get_db)):
+    """Get timer status and statistics in a single request"""
+    return json_response(
+        DashboardResponse.model_construct(
+            status=timer.get_status(db),
+            statistics=statistics.get_statistics(db),
+        )
+    )
 
 
 @router.get("/sessions/{session_id}", response_model=SessionDetailResponse)
@@ -57,7 +96,7 @@ def get_session_details(session_id: int, db: Session = Depends(get_db)):
     result = statistics.get_session_details(db, session_id)
     if result is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return result
+    return json_response(result)
 
 
 @router.put("/sessions/{session_id}", response_model=ActionResponse)
@@ -2,16 +2,25 @@ from pathlib import Path
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from sqlalchemy.orm import Session
 
+from app.config import TEMPLATE_RELOAD
 from app.database import get_db
 from app.services import statistics
-from app.version import get_version
+from app.version import VERSION
 
 router = APIRouter(tags=["pages"])
 
 templates_path = Path(__file__).resolve().parent.parent.parent / "templates"
 templates = Jinja2Templates(directory=templates_path)
+# Templates only change on deploy: skip the per-render mtime check unless
+# TICKTICK_TEMPLATE_RELOAD is set for development, and keep compiled
+# template bytecode across restarts
+templates.env.auto_reload = TEMPLATE_RELOAD
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+# Fixed for the process lifetime, so set once instead of per render
+templates.env.globals["version"] = VERSION
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -19,12 +28,12 @@ async def index(request: Request):
     """Render the main timer page"""
     return templates.TemplateResponse(
         "index.html",
-        {"request": request, "active_page": "timer", "version": get_version()},
+        {"request": request, "active_page": "timer"},
     )
 
 
 @router.get("/statistics", response_class=HTMLResponse)
-async def statistics_page(request: Request, db: Session = Depends(get_db)):
+def statistics_page(request: Request, db: Session = Depends(get_db)):
     """Render the statistics page"""
     stats = statistics.get_statistics(db)
     return templates.TemplateResponse(
@@ -33,6 +42,5 @@ async def statistics_page(request: Request, db: Session = Depends(get_db)):
             "request": request,
             "active_page": "statistics",
             "stats": stats,
-            "version": get_version(),
         },
     )
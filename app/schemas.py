@@ -77,6 +77,11 @@ class StatisticsResponse(BaseModel):
     recent_sessions: list[SessionSummary]
 
 
+class DashboardResponse(BaseModel):
+    status: StatusResponse
+    statistics: StatisticsResponse
+
+
 class PausePeriodInfo(BaseModel):
     id: int
     pause_start: str  # HH:MM format
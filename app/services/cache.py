@@ -0,0 +1,44 @@
+import time
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class VersionedTTLCache(Generic[T]):
+    """
+    Holds a single computed value until it is invalidated or expires.
+
+    Invalidation is process-local, so with several worker processes the TTL
+    bounds how stale the other workers can get.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._entry: tuple[int, Hashable, float, T] | None = None
+
+    def get(self, load: Callable[[], T], key: Hashable = None, refresh: bool = False) -> T:
+        """Return the cached value for key, calling load on a miss or refresh"""
+        # Read the version before loading, so an invalidation that happens
+        # while load runs keeps its (possibly outdated) result out of the cache
+        version = self._version
+
+        entry = self._entry
+        if entry is not None and not refresh:
+            cached_version, cached_key, cached_at, value = entry
+            if (
+                cached_version == version
+                and cached_key == key
+                and time.monotonic() - cached_at < self.ttl_seconds
+            ):
+                return value
+
+        value = load()
+        self._entry = (version, key, time.monotonic(), value)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop the cached value"""
+        self._version += 1
+        self._entry = None
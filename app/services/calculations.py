@@ -1,7 +1,10 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
 
 from app.config import (
     DAILY_REQUIREMENT_MINUTES,
+    DAILY_TARGET_SECONDS,
     MAX_DAILY_HOURS,
     MAX_DAILY_SECONDS,
     LUNCH_THRESHOLD_HOURS,
@@ -13,52 +16,99 @@ from app.models import WorkSession
 MIN_WORK_HOURS = 6
 
 
+@lru_cache(maxsize=4096)
 def format_duration(seconds: int) -> str:
     """Format seconds as HH:MM:SS"""
-    hours, remainder = divmod(abs(seconds), 3600)
-    minutes, secs = divmod(remainder, 60)
     sign = "-" if seconds < 0 else ""
-    return f"{sign}{int(hours):02d}:{int(minutes):02d}:{int(secs):02d}"
+    total = int(abs(seconds))
+    rem = total % 3600
+    return f"{sign}{total // 3600:02d}:{rem // 60:02d}:{rem % 60:02d}"
 
 
+@lru_cache(maxsize=4096)
 def format_duration_short(seconds: int) -> str:
     """Format seconds as HH:MM (without seconds)"""
-    hours, remainder = divmod(abs(seconds), 3600)
-    minutes, _ = divmod(remainder, 60)
     sign = "-" if seconds < 0 else ""
-    return f"{sign}{int(hours):02d}:{int(minutes):02d}"
+    total = int(abs(seconds))
+    return f"{sign}{total // 3600:02d}:{total % 3600 // 60:02d}"
 
 
 def format_time(dt: datetime) -> str:
     """Format datetime as HH:MM"""
-    return dt.strftime("%H:%M")
+    # Plain integer formatting avoids the strftime format parser
+    return f"{dt.hour:02d}:{dt.minute:02d}"
 
 
-def calculate_pause_seconds(session: WorkSession, now: datetime | None = None) -> int:
-    """Calculate total pause time in seconds for a session"""
-    if now is None:
-        now = datetime.now()
+def format_date(d: date) -> str:
+    """Format date as YYYY-MM-DD"""
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
 
-    total_pause = 0
-    for pause in session.pause_periods:
-        pause_end = pause.pause_end or now
-        total_pause += int((pause_end - pause.pause_start).total_seconds())
-    return total_pause
+
+def clamp_seconds(delta: timedelta) -> int:
+    """
+    Whole seconds of a duration, never negative.
+    Times are naive local time, so a DST switch back can put an end before
+    its start; such spans count as zero instead of going negative.
+    """
+    return max(0, int(delta.total_seconds()))
 
 
-def calculate_net_work_seconds(session: WorkSession, now: datetime | None = None) -> int:
-    """Calculate net work time in seconds (elapsed - pauses)"""
-    if now is None:
-        now = datetime.now()
+class SessionTimes(NamedTuple):
+    net_seconds: int
+    pause_seconds: int
+    gross_seconds: int
 
-    if session.end_time:
-        elapsed = (session.end_time - session.start_time).total_seconds()
-    else:
-        elapsed = (now - session.start_time).total_seconds()
 
-    pause_seconds = calculate_pause_seconds(session, now)
-    net = max(0, int(elapsed - pause_seconds))
-    return min(net, MAX_DAILY_SECONDS)
+def summarize_pauses(session: WorkSession) -> tuple[int, datetime | None]:
+    """Return the seconds of all finished pauses and the start of a running pause"""
+    closed_seconds = 0
+    open_pause_start = None
+    for pause in session.pause_periods:
+        if pause.pause_end is None:
+            open_pause_start = pause.pause_start
+        else:
+            closed_seconds += clamp_seconds(pause.pause_end - pause.pause_start)
+    return closed_seconds, open_pause_start
+
+
+def compute_times_from_pauses(
+    start_time: datetime,
+    end_time: datetime,
+    closed_pause_seconds: int,
+    open_pause_start: datetime | None,
+    now: datetime,
+) -> SessionTimes:
+    """Calculate net work, pause and gross time from pre-summed pause seconds"""
+    elapsed = clamp_seconds(end_time - start_time)
+
+    pause_seconds = closed_pause_seconds
+    if open_pause_start is not None:
+        pause_seconds += clamp_seconds(now - open_pause_start)
+
+    net = min(max(0, elapsed - pause_seconds), MAX_DAILY_SECONDS)
+    return SessionTimes(net, pause_seconds, elapsed)
+
+
+def compute_times(session: WorkSession, now: datetime) -> SessionTimes:
+    """Calculate net work, pause and gross time in a single pass over the pauses"""
+    closed_pause_seconds, open_pause_start = summarize_pauses(session)
+    return compute_times_from_pauses(
+        session.start_time,
+        session.end_time or now,
+        closed_pause_seconds,
+        open_pause_start,
+        now,
+    )
+
+
+def calculate_pause_seconds(session: WorkSession, now: datetime) -> int:
+    """Calculate total pause time in seconds for a session"""
+    return compute_times(session, now).pause_seconds
+
+
+def calculate_net_work_seconds(session: WorkSession, now: datetime) -> int:
+    """Calculate net work time in seconds (elapsed - pauses)"""
+    return compute_times(session, now).net_seconds
 
 
 def calculate_lunch_break_minutes(work_minutes: float) -> int:
@@ -107,13 +157,29 @@ def calculate_lunch_break_time(start_time: datetime, pause_minutes: int) -> date
     return start_time + timedelta(minutes=threshold_minutes)
 
 
+class LeaveTimes(NamedTuple):
+    lunch_break_at: str
+    earliest_leave: str
+    normal_leave: str
+    latest_leave: str
+
+
+@lru_cache(maxsize=256)
+def calculate_leave_times(start_time: datetime, pause_minutes: int) -> LeaveTimes:
+    """Formatted lunch break and leave times, which only change with the pause minutes"""
+    return LeaveTimes(
+        lunch_break_at=format_time(calculate_lunch_break_time(start_time, pause_minutes)),
+        earliest_leave=format_time(calculate_earliest_leave(start_time, pause_minutes)),
+        normal_leave=format_time(calculate_normal_leave(start_time, pause_minutes)),
+        latest_leave=format_time(calculate_latest_leave(start_time, pause_minutes)),
+    )
+
+
 def calculate_remaining_for_daily(net_work_seconds: int) -> int:
     """Calculate seconds remaining to reach daily requirement"""
-    target_seconds = int(DAILY_REQUIREMENT_MINUTES * 60)
-    return max(0, target_seconds - net_work_seconds)
+    return max(0, DAILY_TARGET_SECONDS - net_work_seconds)
 
 
 def calculate_overtime_seconds(net_work_seconds: int) -> int:
     """Calculate overtime (positive) or undertime (negative) for the day"""
-    target_seconds = int(DAILY_REQUIREMENT_MINUTES * 60)
-    return net_work_seconds - target_seconds
+    return net_work_seconds - DAILY_TARGET_SECONDS
@@ -1,5 +1,6 @@
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta
+from sqlalchemy import Integer, case, cast, func, select
+from sqlalchemy.orm import Session, selectinload
 
 from app.models import WorkSession
 from app.schemas import (
@@ -13,11 +14,22 @@ from app.schemas import (
 from app.services.calculations import (
     format_duration,
     format_duration_short,
+    format_time,
+    format_date,
     calculate_overtime_seconds,
-    calculate_pause_seconds,
-    calculate_net_work_seconds,
+    compute_times,
+    clamp_seconds,
+)
+from app.services.cache import VersionedTTLCache
+from app.config import DAILY_TARGET_SECONDS
+
+# Statistics only change when sessions are completed, edited or deleted, so
+# the last result is reused until one of those happens
+STATS_CACHE_TTL_SECONDS = 5
+
+_stats_cache: VersionedTTLCache[StatisticsResponse] = VersionedTTLCache(
+    STATS_CACHE_TTL_SECONDS
 )
-from app.config import WEEKLY_HOURS
 
 
 def get_week_start(date: datetime) -> datetime:
@@ -30,53 +42,62 @@ def get_month_start(date: datetime) -> datetime:
     return date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
-def calculate_average_times(
-    sessions: list[WorkSession],
-) -> tuple[str | None, str | None]:
+def seconds_since_midnight(column):
+    """SQL expression for the time-of-day part of a DateTime column in seconds"""
+    return cast(func.strftime("%s", column), Integer) % 86400
+
+
+def format_average_time(total_seconds: int | None, count: int) -> str | None:
+    """Format the average of summed seconds-since-midnight values as HH:MM"""
+    if not count:
+        return None
+    hours, remainder = divmod(total_seconds // count, 3600)
+    minutes, _ = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def period_aggregates(in_period, prefix: str) -> tuple:
+    """Conditional SUM/COUNT columns for the completed sessions of one period"""
+    return (
+        func.coalesce(func.sum(case((in_period, WorkSession.net_seconds))), 0).label(
+            f"{prefix}_total_seconds"
+        ),
+        func.count(func.distinct(case((in_period, WorkSession.date)))).label(
+            f"{prefix}_days_worked"
+        ),
+        func.sum(
+            case((in_period, seconds_since_midnight(WorkSession.start_time)))
+        ).label(f"{prefix}_start_sum"),
+        func.count(case((in_period, WorkSession.start_time))).label(
+            f"{prefix}_start_count"
+        ),
+        func.sum(
+            case((in_period, seconds_since_midnight(WorkSession.end_time)))
+        ).label(f"{prefix}_end_sum"),
+        func.count(case((in_period, WorkSession.end_time))).label(
+            f"{prefix}_end_count"
+        ),
+    )
+
+
+def aggregate_completed_sessions(
+    db: Session, week_start: date, month_start: date, today: date
+):
     """
-    Calculate average start and end times from a list of sessions.
+    Aggregate completed sessions of this week and this month in one scan.
 
-    Returns tuple of (average_start_time, average_end_time) in HH:MM format.
-    Returns None for each if no valid data is available.
+    The week can start in the previous month, so the scanned range begins at
+    whichever start is earlier and each period is selected with CASE.
     """
-    if not sessions:
-        return None, None
-
-    # Calculate average start time
-    # Convert each start time to seconds since midnight
-    start_times_seconds = []
-    for session in sessions:
-        if session.start_time:
-            start = session.start_time
-            seconds_since_midnight = (
-                start.hour * 3600 + start.minute * 60 + start.second
-            )
-            start_times_seconds.append(seconds_since_midnight)
-
-    average_start = None
-    if start_times_seconds:
-        avg_start_seconds = sum(start_times_seconds) // len(start_times_seconds)
-        hours, remainder = divmod(avg_start_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        average_start = f"{hours:02d}:{minutes:02d}"
-
-    # Calculate average end time
-    # Only include sessions with an end_time
-    end_times_seconds = []
-    for session in sessions:
-        if session.end_time:
-            end = session.end_time
-            seconds_since_midnight = end.hour * 3600 + end.minute * 60 + end.second
-            end_times_seconds.append(seconds_since_midnight)
-
-    average_end = None
-    if end_times_seconds:
-        avg_end_seconds = sum(end_times_seconds) // len(end_times_seconds)
-        hours, remainder = divmod(avg_end_seconds, 3600)
-        minutes, _ = divmod(remainder, 60)
-        average_end = f"{hours:02d}:{minutes:02d}"
-
-    return average_start, average_end
+    stmt = select(
+        *period_aggregates(WorkSession.date >= week_start, "week"),
+        *period_aggregates(WorkSession.date >= month_start, "month"),
+    ).where(
+        WorkSession.status == "completed",
+        WorkSession.date >= min(week_start, month_start),
+        WorkSession.date <= today,
+    )
+    return db.execute(stmt).one()
 
 
 def calculate_monthly_target_seconds(days_worked: int) -> int:
@@ -84,52 +105,114 @@ def calculate_monthly_target_seconds(days_worked: int) -> int:
     Calculate monthly target based on days worked.
     Uses daily requirement derived from weekly hours.
     """
-    daily_requirement_seconds = int((WEEKLY_HOURS * 3600) / 5)  # 5 workdays per week
-    return days_worked * daily_requirement_seconds
+    return days_worked * DAILY_TARGET_SECONDS
+
+
+def invalidate_cache() -> None:
+    """Drop cached statistics after sessions were completed, edited or deleted"""
+    _stats_cache.invalidate()
+
+
+def _build_empty_statistics() -> StatisticsResponse:
+    """Statistics for a database without any completed sessions"""
+    zero = format_duration(0)
+    return StatisticsResponse.model_construct(
+        this_week=WeekSummary.model_construct(
+            total_seconds=0,
+            total_formatted=zero,
+            target_seconds=0,
+            target_formatted=zero,
+            days_worked=0,
+            avg_per_day_formatted=zero,
+            overtime_seconds=0,
+            overtime_formatted=zero,
+            average_start_time=None,
+            average_end_time=None,
+        ),
+        this_month=MonthSummary.model_construct(
+            total_seconds=0,
+            total_formatted=zero,
+            days_worked=0,
+            avg_per_day_formatted=zero,
+            overtime_seconds=0,
+            overtime_formatted=zero,
+            average_start_time=None,
+            average_end_time=None,
+        ),
+        recent_sessions=[],
+    )
+
+
+_EMPTY_STATS = _build_empty_statistics()
 
 
 def get_statistics(db: Session) -> StatisticsResponse:
-    """Get comprehensive statistics"""
+    """Get comprehensive statistics, cached between session changes"""
     now = datetime.now()
+    # Keyed by day so the week/month periods move on at midnight
+    return _stats_cache.get(lambda: _compute_statistics(db, now), key=now.date())
+
+
+def _compute_statistics(db: Session, now: datetime) -> StatisticsResponse:
+    """Compute weekly/monthly summaries and recent sessions"""
     today = now.date()
     week_start = get_week_start(now).date()
     month_start = get_month_start(now).date()
 
-    # Get completed sessions for this week
-    week_sessions = (
-        db.query(WorkSession)
-        .filter(
-            WorkSession.status == "completed",
-            WorkSession.date >= week_start,
-            WorkSession.date <= today,
+    # Get recent sessions (last 10), projecting only the displayed columns
+    recent_stmt = (
+        select(
+            WorkSession.id,
+            WorkSession.date,
+            WorkSession.start_time,
+            WorkSession.end_time,
+            WorkSession.net_seconds,
+            WorkSession.status,
         )
-        .all()
+        .where(WorkSession.status == "completed")
+        .order_by(WorkSession.date.desc(), WorkSession.start_time.desc())
+        .limit(10)
     )
 
-    # Get completed sessions for this month
-    month_sessions = (
-        db.query(WorkSession)
-        .filter(
-            WorkSession.status == "completed",
-            WorkSession.date >= month_start,
-            WorkSession.date <= today,
+    recent_sessions = []
+    for row in db.execute(recent_stmt):
+        net_seconds = row.net_seconds or 0
+        overtime = calculate_overtime_seconds(net_seconds)
+        recent_sessions.append(
+            SessionSummary.model_construct(
+                id=row.id,
+                date=format_date(row.date),
+                start_time=format_time(row.start_time),
+                end_time=format_time(row.end_time) if row.end_time else None,
+                net_work_formatted=format_duration_short(net_seconds),
+                overtime_seconds=overtime,
+                overtime_formatted=format_duration_short(overtime),
+                status=row.status,
+            )
         )
-        .all()
-    )
+
+    # Recent sessions are not limited to a period, so none at all means there
+    # is nothing to aggregate either
+    if not recent_sessions:
+        return _EMPTY_STATS
+
+    totals = aggregate_completed_sessions(db, week_start, month_start, today)
+    week_total_seconds = totals.week_total_seconds
+    week_days_worked = totals.week_days_worked
+    month_total_seconds = totals.month_total_seconds
+    month_days_worked = totals.month_days_worked
 
     # Calculate week summary
-    week_total_seconds = sum(s.net_seconds or 0 for s in week_sessions)
-    week_days_worked = len(set(s.date for s in week_sessions))
     week_avg_seconds = (
         week_total_seconds // week_days_worked if week_days_worked > 0 else 0
     )
     # Calculate weekly target based on days worked (like monthly)
-    daily_requirement_seconds = int((WEEKLY_HOURS * 3600) / 5)
-    week_target_seconds = week_days_worked * daily_requirement_seconds
+    week_target_seconds = week_days_worked * DAILY_TARGET_SECONDS
     week_overtime_seconds = week_total_seconds - week_target_seconds
-    week_average_start, week_average_end = calculate_average_times(week_sessions)
+    week_average_start = format_average_time(totals.week_start_sum, totals.week_start_count)
+    week_average_end = format_average_time(totals.week_end_sum, totals.week_end_count)
 
-    week_summary = WeekSummary(
+    week_summary = WeekSummary.model_construct(
         total_seconds=week_total_seconds,
         total_formatted=format_duration(week_total_seconds),
         target_seconds=week_target_seconds,
@@ -143,16 +226,17 @@ def get_statistics(db: Session) -> StatisticsResponse:
     )
 
     # Calculate month summary
-    month_total_seconds = sum(s.net_seconds or 0 for s in month_sessions)
-    month_days_worked = len(set(s.date for s in month_sessions))
     month_avg_seconds = (
         month_total_seconds // month_days_worked if month_days_worked > 0 else 0
     )
     month_target_seconds = calculate_monthly_target_seconds(month_days_worked)
     month_overtime_seconds = month_total_seconds - month_target_seconds
-    month_average_start, month_average_end = calculate_average_times(month_sessions)
+    month_average_start = format_average_time(
+        totals.month_start_sum, totals.month_start_count
+    )
+    month_average_end = format_average_time(totals.month_end_sum, totals.month_end_count)
 
-    month_summary = MonthSummary(
+    month_summary = MonthSummary.model_construct(
         total_seconds=month_total_seconds,
         total_formatted=format_duration(month_total_seconds),
         days_worked=month_days_worked,
@@ -163,33 +247,7 @@ def get_statistics(db: Session) -> StatisticsResponse:
         average_end_time=month_average_end,
     )
 
-    # Get recent sessions (last 10)
-    recent = (
-        db.query(WorkSession)
-        .filter(WorkSession.status == "completed")
-        .order_by(WorkSession.date.desc(), WorkSession.start_time.desc())
-        .limit(10)
-        .all()
-    )
-
-    recent_sessions = []
-    for s in recent:
-        net_seconds = s.net_seconds or 0
-        overtime = calculate_overtime_seconds(net_seconds)
-        recent_sessions.append(
-            SessionSummary(
-                id=s.id,
-                date=s.date.strftime("%Y-%m-%d"),
-                start_time=s.start_time.strftime("%H:%M"),
-                end_time=s.end_time.strftime("%H:%M") if s.end_time else None,
-                net_work_formatted=format_duration_short(net_seconds),
-                overtime_seconds=overtime,
-                overtime_formatted=format_duration_short(overtime),
-                status=s.status,
-            )
-        )
-
-    return StatisticsResponse(
+    return StatisticsResponse.model_construct(
         this_week=week_summary,
         this_month=month_summary,
         recent_sessions=recent_sessions,
@@ -198,50 +256,43 @@ def get_statistics(db: Session) -> StatisticsResponse:
 
 def get_session_details(db: Session, session_id: int) -> SessionDetailResponse | None:
     """Get detailed information about a specific session including all pauses"""
-    session = db.query(WorkSession).filter(WorkSession.id == session_id).first()
+    stmt = (
+        select(WorkSession)
+        .options(selectinload(WorkSession.pause_periods))
+        .where(WorkSession.id == session_id)
+    )
+    session = db.scalars(stmt).first()
 
     if not session:
         return None
 
     now = datetime.now()
+    # Net, gross (elapsed from start to end/now) and total pause time
+    net_seconds, pause_seconds, gross_seconds = compute_times(session, now)
     if session.net_seconds is not None:
         net_seconds = session.net_seconds
-    else:
-        net_seconds = calculate_net_work_seconds(session, now)
-
-    # Calculate gross work time (elapsed time from start to end/now)
-    end_time = session.end_time or now
-    gross_seconds = int((end_time - session.start_time).total_seconds())
-
-    # Calculate total pause time
-    pause_seconds = calculate_pause_seconds(session, now)
 
     overtime = calculate_overtime_seconds(net_seconds)
 
     # Build pause period info list
     pauses = []
     for pause in session.pause_periods:
-        if pause.pause_end:
-            pause_duration = int((pause.pause_end - pause.pause_start).total_seconds())
-        else:
-            pause_duration = int((now - pause.pause_start).total_seconds())
+        pause_duration = clamp_seconds((pause.pause_end or now) - pause.pause_start)
 
         pauses.append(
-            PausePeriodInfo(
+            PausePeriodInfo.model_construct(
                 id=pause.id,
-                pause_start=pause.pause_start.strftime("%H:%M"),
-                pause_end=pause.pause_end.strftime("%H:%M")
-                if pause.pause_end
-                else None,
+                pause_start=format_time(pause.pause_start),
+                pause_end=format_time(pause.pause_end) if pause.pause_end else None,
                 duration_formatted=format_duration_short(pause_duration),
             )
         )
 
-    return SessionDetailResponse(
+    return SessionDetailResponse.model_construct(
         id=session.id,
-        date=session.date.strftime("%Y-%m-%d"),
-        start_time=session.start_time.strftime("%H:%M"),
-        end_time=session.end_time.strftime("%H:%M") if session.end_time else None,
+        date=format_date(session.date),
+        start_time=format_time(session.start_time),
+        end_time=format_time(session.end_time) if session.end_time else None,
         net_work_formatted=format_duration_short(net_seconds),
         gross_work_formatted=format_duration_short(gross_seconds),
         total_pause_formatted=format_duration_short(pause_seconds),
@@ -1,69 +1,174 @@
-from datetime import datetime
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session, selectinload
 
 from app.models import WorkSession, PausePeriod, TimerState
 from app.schemas import StatusResponse, SessionInfo, Calculations, ActionResponse
+from app.services import statistics
+from app.services.cache import VersionedTTLCache
 from app.services.calculations import (
+    SessionTimes,
     calculate_net_work_seconds,
-    calculate_pause_seconds,
-    calculate_earliest_leave,
-    calculate_normal_leave,
-    calculate_latest_leave,
-    calculate_lunch_break_time,
+    compute_times,
+    compute_times_from_pauses,
+    summarize_pauses,
+    calculate_leave_times,
     calculate_remaining_for_daily,
     calculate_overtime_seconds,
     format_duration,
-    format_time,
 )
 from app.config import LUNCH_THRESHOLD_HOURS, MAX_DAILY_SECONDS
 
+# /api/status is polled every second but the timer state only changes on
+# start/pause/continue/stop/reset, so polls are served from an in-process
+# snapshot of the active session
+STATUS_CACHE_TTL_SECONDS = 5
+
+
+class ActiveSessionSnapshot(NamedTuple):
+    id: int
+    start_time: datetime
+    # Set on rows that were stopped elsewhere but are still current
+    end_time: datetime | None
+    is_paused: bool
+    pause_count: int
+    # Finished pauses never change, so they are kept as a plain second count
+    closed_pause_seconds: int
+    open_pause_start: datetime | None
+
+
+# Built once at import; each call only binds the session id and end time
+_END_OPEN_PAUSE_STMT = (
+    update(PausePeriod)
+    .where(
+        PausePeriod.session_id == bindparam("pause_session_id"),
+        PausePeriod.pause_end.is_(None),
+    )
+    .values(pause_end=bindparam("ended_at"))
+)
+
+_status_cache: VersionedTTLCache[ActiveSessionSnapshot | None] = VersionedTTLCache(
+    STATUS_CACHE_TTL_SECONDS
+)
+
 
 def get_or_create_timer_state(db: Session) -> TimerState:
     """Get or create the singleton timer state record"""
-    state = db.query(TimerState).filter(TimerState.id == 1).first()
+    # Kept on the request's session so repeated calls within one request
+    # don't select the singleton row again
+    state = db.info.get("timer_state")
+    if state is not None:
+        return state
+
+    state = db.get(TimerState, 1)
     if not state:
         state = TimerState(id=1, is_running=False, is_paused=False)
         db.add(state)
         db.commit()
-        db.refresh(state)
+    db.info["timer_state"] = state
     return state
 
 
-def get_active_session(db: Session) -> WorkSession | None:
-    """Get the current active session if any"""
-    state = get_or_create_timer_state(db)
+def get_active_session(
+    db: Session, state: TimerState | None = None
+) -> WorkSession | None:
+    """Get the current active session if any, reusing an already loaded state"""
+    if state is None:
+        state = get_or_create_timer_state(db)
     if state.current_session_id:
-        return (
-            db.query(WorkSession)
-            .filter(WorkSession.id == state.current_session_id)
-            .first()
+        return db.get(
+            WorkSession,
+            state.current_session_id,
+            options=[selectinload(WorkSession.pause_periods)],
         )
     return None
 
 
+def find_open_pause(session: WorkSession) -> PausePeriod | None:
+    """Return the running pause from the session's already loaded pauses"""
+    return next((p for p in session.pause_periods if p.pause_end is None), None)
+
+
+def invalidate_status_cache() -> None:
+    """Drop the cached active session snapshot after a timer state change"""
+    _status_cache.invalidate()
+
+
+def get_active_session_snapshot(
+    db: Session, refresh: bool = False
+) -> ActiveSessionSnapshot | None:
+    """Get the active session snapshot, loading it from the database on a miss or refresh"""
+    return _status_cache.get(lambda: _load_active_session_snapshot(db), refresh=refresh)
+
+
+def _load_active_session_snapshot(db: Session) -> ActiveSessionSnapshot | None:
+    """Snapshot the active session and its pauses from the database"""
+    state = get_or_create_timer_state(db)
+    session = get_active_session(db, state)
+    if not session:
+        return None
+
+    closed_pause_seconds, open_pause_start = summarize_pauses(session)
+    return ActiveSessionSnapshot(
+        id=session.id,
+        start_time=session.start_time,
+        end_time=session.end_time,
+        is_paused=state.is_paused,
+        pause_count=len(session.pause_periods),
+        closed_pause_seconds=closed_pause_seconds,
+        open_pause_start=open_pause_start,
+    )
+
+
+def _snapshot_times(snapshot: ActiveSessionSnapshot, now: datetime) -> SessionTimes:
+    """Calculate a snapshot's times exactly as compute_times does for its rows"""
+    return compute_times_from_pauses(
+        snapshot.start_time,
+        snapshot.end_time or now,
+        snapshot.closed_pause_seconds,
+        snapshot.open_pause_start,
+        now,
+    )
+
+
 def get_status(db: Session) -> StatusResponse:
     """Get the current timer status with all calculations"""
-    state = get_or_create_timer_state(db)
-    session = get_active_session(db)
+    session = get_active_session_snapshot(db)
     now = datetime.now()
 
     if not session:
         return StatusResponse(status="idle", session=None, calculations=None)
 
-    net_work_seconds = calculate_net_work_seconds(session, now)
+    net_work_seconds, pause_seconds, _ = _snapshot_times(session, now)
 
-    # Auto-stop when net work reaches the daily maximum
+    # Auto-stop when net work reaches the daily maximum. The snapshot may be
+    # stale (TTL, other workers), so re-check against the loaded rows and
+    # only stop the session the snapshot describes.
     if net_work_seconds >= MAX_DAILY_SECONDS:
-        _auto_stop_session(db, session, state, now)
-        return StatusResponse(
-            status="idle",
-            session=None,
-            calculations=None,
-            auto_stopped=True,
-        )
-
-    status = "paused" if state.is_paused else "running"
-    pause_seconds = calculate_pause_seconds(session, now)
+        state = get_or_create_timer_state(db)
+        active_session = get_active_session(db, state)
+        if (
+            active_session
+            and active_session.id == session.id
+            and compute_times(active_session, now).net_seconds >= MAX_DAILY_SECONDS
+        ):
+            _auto_stop_session(db, active_session, now)
+            return StatusResponse(
+                status="idle",
+                session=None,
+                calculations=None,
+                auto_stopped=True,
+            )
+        # The snapshot was stale: report the loaded session instead, without
+        # re-checking, so a disagreement can never loop
+        session = get_active_session_snapshot(db, refresh=True)
+        if not session:
+            return StatusResponse(status="idle", session=None, calculations=None)
+        net_work_seconds, pause_seconds, _ = _snapshot_times(session, now)
+
+    status = "paused" if session.is_paused else "running"
     pause_minutes = pause_seconds // 60
 
     session_info = SessionInfo(
@@ -72,7 +177,7 @@ def get_status(db: Session) -> StatusResponse:
         current_time=now,
         net_work_seconds=net_work_seconds,
         net_work_formatted=format_duration(net_work_seconds),
-        pause_count=len(session.pause_periods),
+        pause_count=session.pause_count,
         total_pause_seconds=pause_seconds,
     )
 
@@ -80,22 +185,14 @@ def get_status(db: Session) -> StatusResponse:
     lunch_applies = net_work_minutes > LUNCH_THRESHOLD_HOURS * 60
     overtime_seconds = calculate_overtime_seconds(net_work_seconds)
 
+    leave_times = calculate_leave_times(session.start_time, pause_minutes)
+
     calculations = Calculations(
         lunch_break_applies=lunch_applies,
-        lunch_break_at=format_time(
-            calculate_lunch_break_time(session.start_time, pause_minutes)
-        )
-        if not lunch_applies
-        else None,
-        earliest_leave=format_time(
-            calculate_earliest_leave(session.start_time, pause_minutes)
-        ),
-        normal_leave=format_time(
-            calculate_normal_leave(session.start_time, pause_minutes)
-        ),
-        latest_leave=format_time(
-            calculate_latest_leave(session.start_time, pause_minutes)
-        ),
+        lunch_break_at=leave_times.lunch_break_at if not lunch_applies else None,
+        earliest_leave=leave_times.earliest_leave,
+        normal_leave=leave_times.normal_leave,
+        latest_leave=leave_times.latest_leave,
         remaining_for_daily=format_duration(
             calculate_remaining_for_daily(net_work_seconds)
         ),
@@ -126,8 +223,9 @@ def start_timer(db: Session) -> ActionResponse:
         status="active",
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    # Flush only to get the session id; the session row and the state update
+    # below are committed together
+    db.flush()
 
     # Compare-and-set update prevents a race where concurrent starts could both
     # create sessions and overwrite TimerState.current_session_id.
@@ -145,8 +243,7 @@ def start_timer(db: Session) -> ActionResponse:
     )
 
     if rows_updated == 0:
-        db.delete(session)
-        db.commit()
+        db.rollback()
         current_state = get_or_create_timer_state(db)
         return ActionResponse(
             success=False,
@@ -155,6 +252,7 @@ def start_timer(db: Session) -> ActionResponse:
         )
 
     db.commit()
+    invalidate_status_cache()
 
     return ActionResponse(success=True, message="Timer started", status="running")
 
@@ -162,7 +260,7 @@ def start_timer(db: Session) -> ActionResponse:
 def pause_timer(db: Session) -> ActionResponse:
     """Pause the current session"""
     state = get_or_create_timer_state(db)
-    session = get_active_session(db)
+    session = get_active_session(db, state)
 
     if not session:
         return ActionResponse(success=False, message="No active session", status="idle")
@@ -179,6 +277,7 @@ def pause_timer(db: Session) -> ActionResponse:
     state.is_paused = True
     state.is_running = False
     db.commit()
+    invalidate_status_cache()
 
     return ActionResponse(success=True, message="Timer paused", status="paused")
 
@@ -186,7 +285,7 @@ def pause_timer(db: Session) -> ActionResponse:
 def continue_timer(db: Session) -> ActionResponse:
     """Resume from pause"""
     state = get_or_create_timer_state(db)
-    session = get_active_session(db)
+    session = get_active_session(db, state)
 
     if not session:
         return ActionResponse(success=False, message="No active session", status="idle")
@@ -196,19 +295,18 @@ def continue_timer(db: Session) -> ActionResponse:
             success=False, message="Timer not paused", status="running"
         )
 
+    now = datetime.now()
+
     # Find the active pause and end it
-    active_pause = (
-        db.query(PausePeriod)
-        .filter(PausePeriod.session_id == session.id, PausePeriod.pause_end.is_(None))
-        .first()
-    )
+    active_pause = find_open_pause(session)
 
     if active_pause:
-        active_pause.pause_end = datetime.now()
+        active_pause.pause_end = now
 
     state.is_paused = False
     state.is_running = True
     db.commit()
+    invalidate_status_cache()
 
     return ActionResponse(success=True, message="Timer resumed", status="running")
 
@@ -216,32 +314,16 @@ def continue_timer(db: Session) -> ActionResponse:
 def stop_timer(db: Session) -> ActionResponse:
     """Stop and save the current session"""
     state = get_or_create_timer_state(db)
-    session = get_active_session(db)
+    session = get_active_session(db, state)
 
     if not session:
         return ActionResponse(success=False, message="No active session", status="idle")
 
     now = datetime.now()
-
-    # End any active pause
-    active_pause = (
-        db.query(PausePeriod)
-        .filter(PausePeriod.session_id == session.id, PausePeriod.pause_end.is_(None))
-        .first()
-    )
-    if active_pause:
-        active_pause.pause_end = now
-
-    # Calculate and save net work time
-    session.end_time = now
-    session.net_seconds = calculate_net_work_seconds(session, now)
-    session.status = "completed"
-
-    # Reset timer state
-    state.current_session_id = None
-    state.is_running = False
-    state.is_paused = False
-    db.commit()
+    # An open pause counts up to now, so this matches the net time after
+    # the pause is closed below
+    net_seconds = calculate_net_work_seconds(session, now)
+    _complete_session(db, session.id, now, net_seconds)
 
     return ActionResponse(
         success=True, message="Timer stopped and saved", status="idle"
@@ -251,13 +333,14 @@ def stop_timer(db: Session) -> ActionResponse:
 def reset_timer(db: Session) -> ActionResponse:
     """Stop without saving (discard session)"""
     state = get_or_create_timer_state(db)
-    session = get_active_session(db)
+    session = get_active_session(db, state)
 
     if not session:
         return ActionResponse(success=False, message="No active session", status="idle")
 
     # Mark session as reset instead of deleting for audit trail
-    session.end_time = datetime.now()
+    now = datetime.now()
+    session.end_time = now
     session.status = "reset"
 
     # Reset timer state
@@ -265,6 +348,8 @@ def reset_timer(db: Session) -> ActionResponse:
     state.is_running = False
     state.is_paused = False
     db.commit()
+    invalidate_status_cache()
+    statistics.invalidate_cache()
 
     return ActionResponse(
         success=True, message="Timer reset (session discarded)", status="idle"
@@ -290,22 +375,31 @@ def delete_session(db: Session, session_id: int) -> ActionResponse:
             status=current_status,
         )
 
-    session = db.query(WorkSession).filter(WorkSession.id == session_id).first()
+    # Bulk DELETEs instead of loading the session and its pauses for the ORM
+    # cascade. SQLite does not cascade the foreign key, so pauses go first.
+    db.query(PausePeriod).filter(PausePeriod.session_id == session_id).delete()
+    deleted = db.query(WorkSession).filter(WorkSession.id == session_id).delete()
 
-    if not session:
+    if not deleted:
+        db.rollback()
         return ActionResponse(
             success=False, message="Session not found", status=current_status
         )
 
-    # Delete the session (cascade will delete related pause periods)
-    db.delete(session)
     db.commit()
+    statistics.invalidate_cache()
 
     return ActionResponse(
         success=True, message="Session deleted", status=current_status
     )
 
 
+def _parse_hhmm(value: str, day: date) -> datetime:
+    """Combine an HH:MM string with the given day; raises ValueError if malformed"""
+    hours, minutes = value.split(":", 1)
+    return datetime(day.year, day.month, day.day, int(hours), int(minutes))
+
+
 def update_session(
     db: Session, session_id: int, start_time: str | None, end_time: str | None
 ) -> ActionResponse:
@@ -327,7 +421,7 @@ def update_session(
             status=current_status,
         )
 
-    session = db.query(WorkSession).filter(WorkSession.id == session_id).first()
+    session = db.get(WorkSession, session_id)
     if not session:
         return ActionResponse(
             success=False, message="Session not found", status=current_status
@@ -344,8 +438,7 @@ def update_session(
     new_start = session.start_time
     if start_time:
         try:
-            h, m = map(int, start_time.split(":"))
-            new_start = datetime(session_date.year, session_date.month, session_date.day, h, m)
+            new_start = _parse_hhmm(start_time, session_date)
         except (ValueError, AttributeError):
             return ActionResponse(
                 success=False, message="Invalid start_time format (expected HH:MM)", status=current_status
@@ -355,8 +448,7 @@ def update_session(
     new_end = session.end_time
     if end_time:
         try:
-            h, m = map(int, end_time.split(":"))
-            new_end = datetime(session_date.year, session_date.month, session_date.day, h, m)
+            new_end = _parse_hhmm(end_time, session_date)
         except (ValueError, AttributeError):
             return ActionResponse(
                 success=False, message="Invalid end_time format (expected HH:MM)", status=current_status
@@ -368,11 +460,14 @@ def update_session(
             success=False, message="Start time must be before end time", status=current_status
         )
 
-    # Validate against pause periods
-    pauses = sorted(session.pause_periods, key=lambda p: p.pause_start)
+    # Validate against pause periods. Only the first start and the last end
+    # matter, so take them in one pass instead of sorting the pauses
+    pauses = session.pause_periods
     if pauses:
-        first_pause_start = pauses[0].pause_start
-        last_pause_end = pauses[-1].pause_end
+        first_pause_start = min(p.pause_start for p in pauses)
+        last_pause_end = max(
+            (p.pause_end for p in pauses if p.pause_end is not None), default=None
+        )
         if new_start > first_pause_start:
             return ActionResponse(
                 success=False,
@@ -389,32 +484,43 @@ def update_session(
     session.start_time = new_start
     if new_end:
         session.end_time = new_end
-    session.net_seconds = calculate_net_work_seconds(session, session.end_time)
+    session.net_seconds = calculate_net_work_seconds(
+        session, session.end_time or datetime.now()
+    )
     db.commit()
+    statistics.invalidate_cache()
 
     return ActionResponse(
         success=True, message="Session updated", status=current_status
     )
 
 
-def _auto_stop_session(
-    db: Session, session: WorkSession, state: TimerState, now: datetime
+def _complete_session(
+    db: Session, session_id: int, now: datetime, net_seconds: int
 ) -> None:
-    """Auto-stop a session that has reached the daily maximum work time."""
-    # End any active pause
-    active_pause = (
-        db.query(PausePeriod)
-        .filter(PausePeriod.session_id == session.id, PausePeriod.pause_end.is_(None))
-        .first()
+    """End the open pause, complete the session and reset the timer state."""
+    # Plain UPDATE statements: no SELECT for the open pause and no ORM
+    # change tracking, with all three written in one commit
+    db.execute(_END_OPEN_PAUSE_STMT, {"pause_session_id": session_id, "ended_at": now})
+    db.query(WorkSession).filter(WorkSession.id == session_id).update(
+        {
+            WorkSession.end_time: now,
+            WorkSession.net_seconds: net_seconds,
+            WorkSession.status: "completed",
+        }
     )
-    if active_pause:
-        active_pause.pause_end = now
+    db.query(TimerState).filter(TimerState.id == 1).update(
+        {
+            TimerState.current_session_id: None,
+            TimerState.is_running: False,
+            TimerState.is_paused: False,
+        }
+    )
+    db.commit()
+    invalidate_status_cache()
+    statistics.invalidate_cache()
 
-    session.end_time = now
-    session.net_seconds = MAX_DAILY_SECONDS
-    session.status = "completed"
 
-    state.current_session_id = None
-    state.is_running = False
-    state.is_paused = False
-    db.commit()
+def _auto_stop_session(db: Session, session: WorkSession, now: datetime) -> None:
+    """Auto-stop a session that has reached the daily maximum work time."""
+    _complete_session(db, session.id, now, MAX_DAILY_SECONDS)
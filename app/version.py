@@ -2,21 +2,16 @@
 from pathlib import Path
 import tomllib
 
-_version_cache: str | None = None
-
-
-def get_version() -> str:
-    """Read the version from pyproject.toml. Cached after first read."""
-    global _version_cache
-    if _version_cache is not None:
-        return _version_cache
 
+def _load_version() -> str:
+    """Read the version from pyproject.toml"""
     pyproject_path = Path(__file__).resolve().parent.parent / "pyproject.toml"
     try:
-        with open(pyproject_path, "rb") as f:
-            data = tomllib.load(f)
-            _version_cache = data.get("project", {}).get("version", "unknown")
+        data = tomllib.loads(pyproject_path.read_text(encoding="utf-8"))
+        return data.get("project", {}).get("version", "unknown")
     except (FileNotFoundError, tomllib.TOMLDecodeError):
-        _version_cache = "unknown"
+        return "unknown"
+
 
-    return _version_cache
+# The version cannot change while the app is running, so it is read once
+VERSION = _load_version()
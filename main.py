@@ -1,11 +1,33 @@
+from contextlib import asynccontextmanager
 from pathlib import Path
+# anyio is not a direct dependency; it comes with Starlette (see _size_threadpool)
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from app.config import DB_POOL_SIZE, DB_MAX_OVERFLOW
 from app.database import init_db
 from app.routers import api, pages
 
-app = FastAPI(title="TickTick", description="Work time tracking app")
+
+def _size_threadpool(threads: int) -> None:
+    """Set how many sync endpoints may run at once"""
+    # Relies on Starlette's threadpool: run_in_threadpool hands sync endpoints
+    # to anyio's default thread limiter. Revisit this if a Starlette upgrade
+    # changes how sync endpoints are run.
+    to_thread.current_default_thread_limiter().total_tokens = threads
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    # Allow as many threads as there are database connections so neither
+    # side waits on the other
+    _size_threadpool(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    yield
+
+
+app = FastAPI(title="TickTick", description="Work time tracking app", lifespan=lifespan)
 
 # Mount static files
 static_path = Path(__file__).parent / "static"
@@ -17,11 +39,6 @@ app.include_router(api.router)
 app.include_router(pages.router)
 
 
-@app.on_event("startup")
-def startup_event():
-    init_db()
-
-
 if __name__ == "__main__":
     import uvicorn
     from app.config import HOST, PORT